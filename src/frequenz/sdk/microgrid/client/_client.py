@@ -3,9 +3,12 @@
 
 """Client for requests to the Microgrid API."""
 
+from __future__ import annotations
+
 import asyncio
 import logging
 import math
+import time
 from abc import ABC, abstractmethod
 from typing import (
     Any,
@@ -13,10 +16,12 @@ from typing import (
     Callable,
     Dict,
     Iterable,
+    List,
+    NamedTuple,
     Optional,
     Set,
+    Tuple,
     TypeVar,
-    cast,
 )
 
 import grpc
@@ -45,6 +50,10 @@ from ._retry import LinearBackoff, RetryStrategy
 # Default timeout applied to all gRPC calls
 DEFAULT_GRPC_CALL_TIMEOUT = 60.0
 
+# How long (in seconds) the component categories fetched for validating
+# component IDs are reused before they are fetched again from the API.
+COMPONENTS_CACHE_TTL = 30.0
+
 # A generic type for representing various component data types, used in the
 # generic function `MicrogridGrpcClient._component_data_task` that fetches
 # component data and transforms it into one of the specific types.
@@ -56,9 +65,80 @@ _GenericComponentData = TypeVar(
     EVChargerData,
 )
 
+# Component categories that are not considered part of the microgrid itself,
+# and are therefore filtered out by `MicrogridGrpcClient.components`.
+_EXCLUDED_COMPONENT_CATEGORIES = (
+    microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_SENSOR,
+    microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_LOAD,
+)
+
+# Filters used when no filtering is requested.  They are never modified, so
+# they can be shared by all calls.
+_EMPTY_COMPONENT_FILTER = microgrid_pb.ComponentFilter()
+_EMPTY_CONNECTION_FILTER = microgrid_pb.ConnectionFilter()
+
+# Status codes with which component data streams are expected to end, for
+# example when the API service is restarted.  The stream is retried, like for
+# any other error, but these are logged without a traceback.
+_EXPECTED_STREAM_END_CODES = (
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.CANCELLED,
+)
+
+# Functions for transforming the raw data streamed for a component into the
+# data type of its category.
+_COMPONENT_DATA_TRANSFORMS: Dict[
+    ComponentCategory, Callable[[microgrid_pb.ComponentData], Any]
+] = {
+    ComponentCategory.METER: MeterData.from_proto,
+    ComponentCategory.BATTERY: BatteryData.from_proto,
+    ComponentCategory.INVERTER: InverterData.from_proto,
+    ComponentCategory.EV_CHARGER: EVChargerData.from_proto,
+}
+
 _logger = logging.getLogger(__name__)
 
 
+class _ComponentStream(NamedTuple):
+    """The objects making up the data stream of a single component."""
+
+    channel: Broadcast[Any]
+    """The channel the component data is broadcast on."""
+
+    sender: Sender[Any]
+    """The sender of the channel.
+
+    The same sender is used for the whole lifetime of the stream, including
+    reconnects.
+    """
+
+    task: asyncio.Task[None]
+    """The task streaming the data from the API into the channel.
+
+    A reference is kept here so that the task is not garbage collected while
+    it is running.
+    """
+
+
+def _with_details(err: grpc.aio.AioRpcError, details: str) -> grpc.aio.AioRpcError:
+    """Return a copy of a gRPC error with different details.
+
+    Args:
+        err: The original error.
+        details: The details of the new error.
+
+    Returns:
+        A new error with the status, metadata and debug string of `err`.
+    """
+    return grpc.aio.AioRpcError(
+        code=err.code(),
+        initial_metadata=err.initial_metadata(),
+        trailing_metadata=err.trailing_metadata(),
+        details=details,
+        debug_error_string=err.debug_error_string(),
+    )
+
+
 class MicrogridApiClient(ABC):
     """Base interface for microgrid API clients to implement."""
 
@@ -216,8 +296,12 @@ class MicrogridGrpcClient(MicrogridApiClient):
         """
         self.target = target
         self.api = MicrogridStub(grpc_channel)
-        self._component_streams: Dict[int, Broadcast[Any]] = {}
+        self._component_streams: Dict[int, _ComponentStream] = {}
         self._retry_spec = retry_spec
+        self._components_cache: Optional[Dict[int, ComponentCategory]] = None
+        self._components_cache_ts: float = 0.0
+        # Created lazily, so that it is bound to the running event loop.
+        self._components_cache_lock: Optional[asyncio.Lock] = None
 
     async def components(self) -> Iterable[Component]:
         """Fetch all the components present in the microgrid.
@@ -225,6 +309,23 @@ class MicrogridGrpcClient(MicrogridApiClient):
         Returns:
             Iterator whose elements are all the components in the microgrid.
 
+        Raises:
+            AioRpcError: if connection to Microgrid API cannot be established or
+                when the api call exceeded timeout
+        """
+        components, _ = await self._fetch_components()
+        return components
+
+    async def _fetch_components(
+        self,
+    ) -> Tuple[List[Component], Dict[int, ComponentCategory]]:
+        """Fetch all the components present in the microgrid.
+
+        Returns:
+            A tuple with the list of all the components in the microgrid, and a
+                dictionary mapping their ids to their categories, both built in
+                a single pass over the API response.
+
         Raises:
             AioRpcError: if connection to Microgrid API cannot be established or
                 when the api call exceeded timeout
@@ -232,37 +333,35 @@ class MicrogridGrpcClient(MicrogridApiClient):
         try:
             # grpc.aio is missing types and mypy thinks this is not awaitable,
             # but it is
-            component_list = await self.api.ListComponents(
-                microgrid_pb.ComponentFilter(),
+            component_list = await self.api.ListComponents(  # type: ignore[misc]
+                _EMPTY_COMPONENT_FILTER,
                 timeout=DEFAULT_GRPC_CALL_TIMEOUT,  # type: ignore[arg-type]
-            )  # type: ignore[misc]
+            )
         except grpc.aio.AioRpcError as err:
-            msg = f"Failed to list components. Microgrid API: {self.target}. Err: {err.details()}"
-            raise grpc.aio.AioRpcError(
-                code=err.code(),
-                initial_metadata=err.initial_metadata(),
-                trailing_metadata=err.trailing_metadata(),
-                details=msg,
-                debug_error_string=err.debug_error_string(),
+            raise _with_details(
+                err,
+                f"Failed to list components. Microgrid API: {self.target}. "
+                f"Err: {err.details()}",
+            ) from err
+
+        components: List[Component] = []
+        categories: Dict[int, ComponentCategory] = {}
+        for pb_component in component_list.components:
+            if pb_component.category in _EXCLUDED_COMPONENT_CATEGORIES:
+                continue
+            category = _component_category_from_protobuf(pb_component.category)
+            components.append(
+                Component(
+                    pb_component.id,
+                    category,
+                    _component_type_from_protobuf(
+                        pb_component.category, pb_component.inverter
+                    ),
+                )
             )
-        components_only = filter(
-            lambda c: c.category
-            not in (
-                microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_SENSOR,
-                microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_LOAD,
-            ),
-            component_list.components,
-        )
-        result: Iterable[Component] = map(
-            lambda c: Component(
-                c.id,
-                _component_category_from_protobuf(c.category),
-                _component_type_from_protobuf(c.category, c.inverter),
-            ),
-            components_only,
-        )
+            categories[pb_component.id] = category
 
-        return result
+        return components, categories
 
     async def connections(
         self,
@@ -284,42 +383,40 @@ class MicrogridGrpcClient(MicrogridApiClient):
             AioRpcError: if connection to Microgrid API cannot be established or
                 when the api call exceeded timeout
         """
-        connection_filter = microgrid_pb.ConnectionFilter(starts=starts, ends=ends)
+        connection_filter = (
+            _EMPTY_CONNECTION_FILTER
+            if starts is None and ends is None
+            else microgrid_pb.ConnectionFilter(starts=starts, ends=ends)
+        )
         try:
-            valid_components, all_connections = await asyncio.gather(
-                self.components(),
-                # grpc.aio is missing types and mypy thinks this is not
-                # awaitable, but it is
-                cast(
-                    Awaitable[microgrid_pb.ConnectionList],
-                    self.api.ListConnections(
-                        connection_filter,
-                        timeout=DEFAULT_GRPC_CALL_TIMEOUT,  # type: ignore[arg-type]
-                    ),
-                ),
+            # grpc.aio is missing types and mypy thinks this is not awaitable,
+            # but it is.  An annotation is used instead of `cast()` to avoid a
+            # function call at runtime.
+            list_connections: Awaitable[
+                microgrid_pb.ConnectionList
+            ] = self.api.ListConnections(  # type: ignore[assignment]
+                connection_filter,
+                timeout=DEFAULT_GRPC_CALL_TIMEOUT,  # type: ignore[arg-type]
             )
-        except grpc.aio.AioRpcError as err:
-            msg = f"Failed to list connections. Microgrid API: {self.target}. Err: {err.details()}"
-            raise grpc.aio.AioRpcError(
-                code=err.code(),
-                initial_metadata=err.initial_metadata(),
-                trailing_metadata=err.trailing_metadata(),
-                details=msg,
-                debug_error_string=err.debug_error_string(),
+            (_, valid_categories), all_connections = await asyncio.gather(
+                self._fetch_components(),
+                list_connections,
             )
+        except grpc.aio.AioRpcError as err:
+            raise _with_details(
+                err,
+                f"Failed to list connections. Microgrid API: {self.target}. "
+                f"Err: {err.details()}",
+            ) from err
         # Filter out the components filtered in `components` method.
         # id=0 is an exception indicating grid component.
-        valid_ids = {c.component_id for c in valid_components}
-        valid_ids.add(0)
+        valid_ids = valid_categories.keys() | {0}
 
-        connections = filter(
-            lambda c: (c.start in valid_ids and c.end in valid_ids),
-            all_connections.connections,
-        )
-
-        result: Iterable[Connection] = map(
-            lambda c: Connection(c.start, c.end), connections
-        )
+        result: Iterable[Connection] = [
+            Connection(c.start, c.end)
+            for c in all_connections.connections
+            if c.start in valid_ids and c.end in valid_ids
+        ]
 
         return result
 
@@ -335,7 +432,8 @@ class MicrogridGrpcClient(MicrogridApiClient):
             component_id: id of the component to get data for.
             transform: A method for transforming raw component data into the
                 desired output type.
-            sender: A channel sender, to send the component data to.
+            sender: A channel sender, to send the component data to.  It is
+                reused when the stream is re-established after an error.
 
         Raises:
             AioRpcError: if connection to Microgrid API cannot be established
@@ -355,12 +453,23 @@ class MicrogridGrpcClient(MicrogridApiClient):
                     await sender.send(transform(msg))
             except grpc.aio.AioRpcError as err:
                 api_details = f"Microgrid API: {self.target}."
-                _logger.exception(
-                    "`GetComponentData`, for component_id=%d: exception: %s api: %s",
-                    component_id,
-                    err,
-                    api_details,
-                )
+                if err.code() in _EXPECTED_STREAM_END_CODES:
+                    # No need for a traceback when the server just went away.
+                    _logger.warning(
+                        "`GetComponentData`, for component_id=%d: stream ended: %s "
+                        "api: %s",
+                        component_id,
+                        err.code(),
+                        api_details,
+                    )
+                else:
+                    _logger.exception(
+                        "`GetComponentData`, for component_id=%d: exception: %s "
+                        "api: %s",
+                        component_id,
+                        err,
+                        api_details,
+                    )
 
             if interval := retry_spec.next_interval():
                 _logger.warning(
@@ -400,21 +509,52 @@ class MicrogridGrpcClient(MicrogridApiClient):
             The channel for the given component_id.
         """
         if component_id in self._component_streams:
-            return self._component_streams[component_id]
+            return self._component_streams[component_id].channel
         task_name = f"raw-component-data-{component_id}"
         chan = Broadcast[_GenericComponentData](task_name)
-        self._component_streams[component_id] = chan
+        sender = chan.new_sender()
 
-        asyncio.create_task(
+        task = asyncio.create_task(
             self._component_data_task(
                 component_id,
                 transform,
-                chan.new_sender(),
+                sender,
             ),
             name=task_name,
         )
+        self._component_streams[component_id] = _ComponentStream(chan, sender, task)
         return chan
 
+    async def _component_categories(
+        self, component_id: int
+    ) -> Dict[int, ComponentCategory]:
+        """Return the categories of all components in the microgrid.
+
+        The categories are cached for `COMPONENTS_CACHE_TTL` seconds.  The cache
+        is refreshed earlier if it doesn't contain the given `component_id`, so
+        that newly added components can be found.
+
+        Args:
+            component_id: Component id that is going to be looked up.
+
+        Returns:
+            A dictionary mapping component ids to their categories.
+        """
+        if self._components_cache_lock is None:
+            self._components_cache_lock = asyncio.Lock()
+
+        # Concurrent callers wait for a single refresh instead of each sending
+        # its own request.
+        async with self._components_cache_lock:
+            if (
+                self._components_cache is None
+                or component_id not in self._components_cache
+                or time.monotonic() - self._components_cache_ts >= COMPONENTS_CACHE_TTL
+            ):
+                _, self._components_cache = await self._fetch_components()
+                self._components_cache_ts = time.monotonic()
+            return self._components_cache
+
     async def _expect_category(
         self,
         component_id: int,
@@ -430,23 +570,42 @@ class MicrogridGrpcClient(MicrogridApiClient):
             expected_category: Component category that the given id is expected
                 to have.
         """
-        try:
-            comp = next(
-                comp
-                for comp in await self.components()
-                if comp.component_id == component_id
-            )
-        except StopIteration as exc:
-            raise ValueError(
-                f"Unable to find component with id {component_id}"
-            ) from exc
+        category = (await self._component_categories(component_id)).get(component_id)
+        if category is None:
+            raise ValueError(f"Unable to find component with id {component_id}")
 
-        if comp.category != expected_category:
+        if category != expected_category:
             raise ValueError(
-                f"Component id {component_id} is a {comp.category}"
+                f"Component id {component_id} is a {category}"
                 f", not a {expected_category}."
             )
 
+    async def _typed_receiver(
+        self,
+        component_id: int,
+        category: ComponentCategory,
+        maxsize: int,
+    ) -> Receiver[Any]:
+        """Return a channel receiver for the data of a component.
+
+        Raises:
+            ValueError: if the given id is unknown or has a different type.
+
+        Args:
+            component_id: id of the component to get data for.
+            category: Component category that the given id is expected to
+                have.  It determines the type of the received data.
+            maxsize: Size of the receiver's buffer.
+
+        Returns:
+            A channel receiver that provides realtime component data.
+        """
+        await self._expect_category(component_id, category)
+        return self._get_component_data_channel(
+            component_id,
+            _COMPONENT_DATA_TRANSFORMS[category],
+        ).new_receiver(maxsize=maxsize)
+
     async def meter_data(
         self,
         component_id: int,
@@ -468,14 +627,9 @@ class MicrogridGrpcClient(MicrogridApiClient):
         Returns:
             A channel receiver that provides realtime meter data.
         """
-        await self._expect_category(
-            component_id,
-            ComponentCategory.METER,
+        return await self._typed_receiver(
+            component_id, ComponentCategory.METER, maxsize
         )
-        return self._get_component_data_channel(
-            component_id,
-            MeterData.from_proto,
-        ).new_receiver(maxsize=maxsize)
 
     async def battery_data(
         self,
@@ -498,14 +652,9 @@ class MicrogridGrpcClient(MicrogridApiClient):
         Returns:
             A channel receiver that provides realtime battery data.
         """
-        await self._expect_category(
-            component_id,
-            ComponentCategory.BATTERY,
+        return await self._typed_receiver(
+            component_id, ComponentCategory.BATTERY, maxsize
         )
-        return self._get_component_data_channel(
-            component_id,
-            BatteryData.from_proto,
-        ).new_receiver(maxsize=maxsize)
 
     async def inverter_data(
         self,
@@ -528,14 +677,9 @@ class MicrogridGrpcClient(MicrogridApiClient):
         Returns:
             A channel receiver that provides realtime inverter data.
         """
-        await self._expect_category(
-            component_id,
-            ComponentCategory.INVERTER,
+        return await self._typed_receiver(
+            component_id, ComponentCategory.INVERTER, maxsize
         )
-        return self._get_component_data_channel(
-            component_id,
-            InverterData.from_proto,
-        ).new_receiver(maxsize=maxsize)
 
     async def ev_charger_data(
         self,
@@ -558,14 +702,9 @@ class MicrogridGrpcClient(MicrogridApiClient):
         Returns:
             A channel receiver that provides realtime ev charger data.
         """
-        await self._expect_category(
-            component_id,
-            ComponentCategory.EV_CHARGER,
+        return await self._typed_receiver(
+            component_id, ComponentCategory.EV_CHARGER, maxsize
         )
-        return self._get_component_data_channel(
-            component_id,
-            EVChargerData.from_proto,
-        ).new_receiver(maxsize=maxsize)
 
     async def set_power(self, component_id: int, power_w: float) -> Empty:
         """Send request to the Microgrid to set power for component.
@@ -607,14 +746,11 @@ class MicrogridGrpcClient(MicrogridApiClient):
                     timeout=DEFAULT_GRPC_CALL_TIMEOUT,  # type: ignore[arg-type]
                 )  # type: ignore[misc]
         except grpc.aio.AioRpcError as err:
-            msg = f"Failed to set power. Microgrid API: {self.target}. Err: {err.details()}"
-            raise grpc.aio.AioRpcError(
-                code=err.code(),
-                initial_metadata=err.initial_metadata(),
-                trailing_metadata=err.trailing_metadata(),
-                details=msg,
-                debug_error_string=err.debug_error_string(),
-            )
+            raise _with_details(
+                err,
+                f"Failed to set power. Microgrid API: {self.target}. "
+                f"Err: {err.details()}",
+            ) from err
         return result
 
     async def set_bounds(
@@ -640,29 +776,32 @@ class MicrogridGrpcClient(MicrogridApiClient):
         if upper < 0:
             raise ValueError(f"Upper bound {upper} must be greater than or equal to 0.")
         if lower > 0:
-            raise ValueError(f"Lower bound {upper} must be less than or equal to 0.")
+            raise ValueError(f"Lower bound {lower} must be less than or equal to 0.")
 
         # grpc.aio is missing types and mypy thinks request_iterator is
         # a required argument, but it is not
         set_bounds_call = self.api.SetBounds(
             timeout=DEFAULT_GRPC_CALL_TIMEOUT,
         )  # type: ignore[call-arg]
+        msg = microgrid_pb.SetBoundsParam(
+            component_id=component_id,
+            # pylint: disable=no-member,line-too-long
+            target_metric=microgrid_pb.SetBoundsParam.TargetMetric.TARGET_METRIC_POWER_ACTIVE,
+            bounds=common_pb.Bounds(lower=lower, upper=upper),
+        )
         try:
             # grpc.aio is missing types and mypy thinks set_bounds_call can be Empty
             assert not isinstance(set_bounds_call, Empty)
-            await set_bounds_call.write(
-                microgrid_pb.SetBoundsParam(
-                    component_id=component_id,
-                    # pylint: disable=no-member,line-too-long
-                    target_metric=microgrid_pb.SetBoundsParam.TargetMetric.TARGET_METRIC_POWER_ACTIVE,
-                    bounds=common_pb.Bounds(lower=lower, upper=upper),
-                ),
-            )
+            await set_bounds_call.write(msg)
+            # Close the request stream and wait for the response, so that the
+            # call is not left open and errors from the server are reported.
+            await set_bounds_call.done_writing()
+            await set_bounds_call
         except grpc.aio.AioRpcError as err:
             _logger.error(
                 "set_bounds write failed: %s, for message: %s, api: %s. Err: %s",
                 err,
-                next,
+                msg,
                 api_details,
                 err.details(),
             )
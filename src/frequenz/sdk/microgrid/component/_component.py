@@ -26,6 +26,11 @@ class InverterType(ComponentType):
     HYBRID = inverter_pb.Type.TYPE_HYBRID
 
 
+# Lookup table for converting protobuf inverter types, so the conversion
+# doesn't need to go through all the enum members.
+_INVERTER_TYPES_BY_VALUE = {t.value: t for t in InverterType}
+
+
 def _component_type_from_protobuf(
     component_category: microgrid_pb.ComponentCategory.ValueType,
     component_type: inverter_pb.Type.ValueType,
@@ -45,10 +50,7 @@ def _component_type_from_protobuf(
     # as of v0.11.0, so we need to check the component category first, before doing any
     # component type checks.
     if component_category == microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_INVERTER:
-        if not any(t.value == component_type for t in InverterType):
-            return None
-
-        return InverterType(component_type)
+        return _INVERTER_TYPES_BY_VALUE.get(component_type)
 
     return None
 
@@ -71,6 +73,11 @@ class ComponentCategory(Enum):
     CHP = 1000002  # combined heat and power plant
 
 
+# Lookup table for converting protobuf component categories, so the
+# conversion doesn't need to go through all the enum members.
+_COMPONENT_CATEGORIES_BY_VALUE = {c.value: c for c in ComponentCategory}
+
+
 def _component_category_from_protobuf(
     component_category: microgrid_pb.ComponentCategory.ValueType,
 ) -> ComponentCategory:
@@ -92,10 +99,9 @@ def _component_category_from_protobuf(
     if component_category == microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_SENSOR:
         raise ValueError("Cannot create a component from a sensor!")
 
-    if not any(t.value == component_category for t in ComponentCategory):
-        return ComponentCategory.NONE
-
-    return ComponentCategory(component_category)
+    return _COMPONENT_CATEGORIES_BY_VALUE.get(
+        component_category, ComponentCategory.NONE
+    )
 
 
 @dataclass(frozen=True)
@@ -67,9 +67,8 @@ class BatteryPowerFormula(FormulaGenerator):
                 "Can't find inverters for all batteries from the component graph."
             )
 
-        for idx, comp in enumerate(battery_inverters):
-            if idx > 0:
-                builder.push_oper("+")
-            builder.push_component_metric(comp.component_id, nones_are_zeros=True)
+        builder.push_component_metrics_sum(
+            (comp.component_id for comp in battery_inverters), nones_are_zeros=True
+        )
 
         return builder.build()
@@ -6,14 +6,23 @@
 from __future__ import annotations
 
 import logging
-from collections import abc
 
 from ....microgrid.component import ComponentMetricId
-from .._formula_engine import FormulaEngine, FormulaEngine3Phase
+from .._formula_engine import FormulaEngine3Phase
 from ._formula_generator import NON_EXISTING_COMPONENT_ID, FormulaGenerator
 
 _logger = logging.getLogger(__name__)
 
+# The name of the formulas generated here.
+_EV_CURRENT = "ev-current"
+
+# The metrics to add up for each phase, in phase order.
+_PHASE_METRICS = (
+    ComponentMetricId.CURRENT_PHASE_1,
+    ComponentMetricId.CURRENT_PHASE_2,
+    ComponentMetricId.CURRENT_PHASE_3,
+)
+
 
 class EVChargerCurrentFormula(FormulaGenerator):
     """Create a formula engine from the component graph for calculating grid current."""
@@ -35,49 +44,24 @@ class EVChargerCurrentFormula(FormulaGenerator):
             # If there are no EV Chargers, we have to send 0 values as the same
             # frequency as the other streams.  So we subscribe with a non-existing
             # component id, just to get a `None` message at the resampling interval.
-            builder = self._get_builder("ev-current", ComponentMetricId.ACTIVE_POWER)
+            builder = self._get_builder(_EV_CURRENT, ComponentMetricId.ACTIVE_POWER)
             builder.push_component_metric(
                 NON_EXISTING_COMPONENT_ID, nones_are_zeros=True
             )
             engine = builder.build()
-            return FormulaEngine3Phase(
-                "ev-current",
-                (engine, engine, engine),
-            )
-
-        return FormulaEngine3Phase(
-            "ev-current",
-            (
-                (
-                    self._gen_phase_formula(
-                        component_ids, ComponentMetricId.CURRENT_PHASE_1
-                    )
-                ),
-                (
-                    self._gen_phase_formula(
-                        component_ids, ComponentMetricId.CURRENT_PHASE_2
-                    )
-                ),
-                (
-                    self._gen_phase_formula(
-                        component_ids, ComponentMetricId.CURRENT_PHASE_3
-                    )
-                ),
-            ),
-        )
-
-    def _gen_phase_formula(
-        self,
-        component_ids: abc.Set[int],
-        metric_id: ComponentMetricId,
-    ) -> FormulaEngine:
-        builder = self._get_builder("ev-current", metric_id)
+            # The same engine can be used for all three phases without them
+            # interfering with each other: the engine runs a single task, and
+            # `FormulaEngine3Phase` gets a separate receiver from it for each phase.
+            return FormulaEngine3Phase(_EV_CURRENT, (engine, engine, engine))
 
-        # generate a formula that just adds values from all EV Chargers.
-        for idx, component_id in enumerate(component_ids):
-            if idx > 0:
-                builder.push_oper("+")
+        builders = [self._get_builder(_EV_CURRENT, metric) for metric in _PHASE_METRICS]
 
-            builder.push_component_metric(component_id, nones_are_zeros=True)
+        # generate formulas that just add values from all EV Chargers.  The ids are
+        # sorted once into a tuple that is shared by all phases, so that the
+        # formulas don't depend on the set's iteration order.
+        sorted_ids = tuple(sorted(component_ids))
+        for builder in builders:
+            builder.push_component_metrics_sum(sorted_ids, nones_are_zeros=True)
 
-        return builder.build()
+        phase_1, phase_2, phase_3 = (builder.build() for builder in builders)
+        return FormulaEngine3Phase(_EV_CURRENT, (phase_1, phase_2, phase_3))
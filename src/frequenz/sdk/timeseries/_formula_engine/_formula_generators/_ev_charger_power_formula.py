@@ -38,10 +38,6 @@ class EVChargerPowerFormula(FormulaGenerator):
             )
             return builder.build()
 
-        for idx, component_id in enumerate(component_ids):
-            if idx > 0:
-                builder.push_oper("+")
-
-            builder.push_component_metric(component_id, nones_are_zeros=True)
+        builder.push_component_metrics_sum(component_ids, nones_are_zeros=True)
 
         return builder.build()
@@ -49,10 +49,8 @@ class PVPowerFormula(FormulaGenerator):
             )
             return builder.build()
 
-        for idx, comp in enumerate(pv_inverters):
-            if idx > 0:
-                builder.push_oper("+")
-
-            builder.push_component_metric(comp.component_id, nones_are_zeros=True)
+        builder.push_component_metrics_sum(
+            (comp.component_id for comp in pv_inverters), nones_are_zeros=True
+        )
 
         return builder.build()
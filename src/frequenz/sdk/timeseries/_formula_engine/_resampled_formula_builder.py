@@ -6,6 +6,8 @@
 
 from __future__ import annotations
 
+from typing import Iterable
+
 from frequenz.channels import Receiver, Sender
 
 from ...actor import ChannelRegistry, ComponentMetricRequest
@@ -79,6 +81,29 @@ class ResampledFormulaBuilder(FormulaBuilder):
         receiver = self._get_resampled_receiver(component_id, self._metric_id)
         self.push_metric(f"#{component_id}", receiver, nones_are_zeros)
 
+    def push_component_metrics_sum(
+        self, component_ids: Iterable[int], *, nones_are_zeros: bool
+    ) -> None:
+        """Push the sum of resampled component metric streams to the formula engine.
+
+        This is equivalent to calling `push_component_metric` for each of the given
+        component ids, with a `+` operator pushed in between.
+
+        Args:
+            component_ids: The component ids whose metrics are to be added.  If
+                empty, nothing is pushed.
+            nones_are_zeros: Whether to treat None values from the streams as 0s.  If
+                False, the returned value will be a None.
+        """
+        ids = iter(component_ids)
+        first = next(ids, None)
+        if first is None:
+            return
+        self.push_component_metric(first, nones_are_zeros=nones_are_zeros)
+        for component_id in ids:
+            self.push_oper("+")
+            self.push_component_metric(component_id, nones_are_zeros=nones_are_zeros)
+
     def from_string(
         self,
         formula: str,
@@ -271,7 +271,9 @@ class MovingWindow:
         elif isinstance(key, datetime):
             _logger.debug("Returning value at time %s ", key)
             return self._buffer[self._buffer.datetime_to_index(key)]
-        elif isinstance(key, SupportsIndex):
+        # Checking for `int` first avoids the (much slower) runtime protocol check
+        # for the common case.
+        elif isinstance(key, (int, SupportsIndex)):
             return self._buffer[key]
 
         raise TypeError(
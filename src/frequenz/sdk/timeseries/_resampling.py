@@ -115,7 +115,7 @@ def average(
         The average of all `samples` values.
     """
     assert len(samples) > 0, "Average cannot be given an empty list of samples"
-    values = list(sample.value for sample in samples if sample.value is not None)
+    values = [sample.value for sample in samples if sample.value is not None]
     return sum(values) / len(values)
 
 
@@ -376,6 +376,12 @@ class Resampler:
         the window end is deterministic.
         """
 
+        self._timer_tolerance: timedelta = config.resampling_period / 10
+        """How late the resampling task can wake up before a warning is logged.
+
+        We use a tolerance of 10% of the resampling period.
+        """
+
     @property
     def config(self) -> ResamplerConfig:
         """Get the resampler configuration.
@@ -460,18 +466,21 @@ class Resampler:
         while True:
             await self._wait_for_next_resampling_period()
 
+            # Take a snapshot, so results can be matched to their sources even if
+            # timeseries are added or removed while resampling.
+            resamplers = list(self._resamplers.items())
             results = await asyncio.gather(
-                *[r.resample(self._window_end) for r in self._resamplers.values()],
+                *[helper.resample(self._window_end) for _, helper in resamplers],
                 return_exceptions=True,
             )
 
             self._window_end = self._window_end + self._config.resampling_period
             exceptions = {
-                source: results[i]
-                for i, source in enumerate(self._resamplers)
+                source: result
+                for (source, _), result in zip(resamplers, results)
                 # CancelledError inherits from BaseException, but we don't want
                 # to catch *all* BaseExceptions here.
-                if isinstance(results[i], (Exception, asyncio.CancelledError))
+                if isinstance(result, (Exception, asyncio.CancelledError))
             }
             if exceptions:
                 raise ResamplingError(exceptions)
@@ -491,10 +500,7 @@ class Resampler:
             await asyncio.sleep(sleep_for.total_seconds())
 
         timer_error = now - self._window_end
-        # We use a tolerance of 10% of the resampling period
-        tolerance = timedelta(
-            seconds=self._config.resampling_period.total_seconds() / 10.0
-        )
+        tolerance = self._timer_tolerance
         if timer_error > tolerance:
             _logger.warning(
                 "The resampling task woke up too late. Resampling should have "
@@ -551,7 +557,20 @@ class _ResamplingHelper:
         self._name = name
         self._config = config
         self._buffer: deque[Sample] = deque(maxlen=config.initial_buffer_len)
+        # The timestamps of the samples in `_buffer`, kept in sync with it, so we
+        # can bisect on plain `datetime`s, which compare much faster than samples.
+        self._timestamps: deque[datetime] = deque(maxlen=config.initial_buffer_len)
         self._source_properties: SourceProperties = SourceProperties()
+        # How many samples we need to receive before calculating the source
+        # sampling period.
+        self._min_samples_for_period: float = (
+            config.resampling_period.total_seconds() * config.max_data_age_in_periods
+        )
+        # Samples older than this (relative to the resampling timestamp) are not
+        # relevant.  It only changes when the source sampling period is known.
+        self._max_relevant_age: timedelta = (
+            config.resampling_period * config.max_data_age_in_periods
+        )
 
     @property
     def source_properties(self) -> SourceProperties:
@@ -569,6 +588,7 @@ class _ResamplingHelper:
             sample: The sample to be added to the buffer.
         """
         self._buffer.append(sample)
+        self._timestamps.append(sample.timestamp)
         if self._source_properties.sampling_start is None:
             self._source_properties.sampling_start = sample.timestamp
         self._source_properties.received_samples += 1
@@ -593,8 +613,7 @@ class _ResamplingHelper:
         if (
             props.sampling_period is not None
             or props.sampling_start is None
-            or props.received_samples
-            < config.resampling_period.total_seconds() * config.max_data_age_in_periods
+            or props.received_samples < self._min_samples_for_period
             or len(self._buffer) < self._buffer.maxlen
             # There might be a race between the first sample being received and
             # this function being called
@@ -606,6 +625,12 @@ class _ResamplingHelper:
         props.sampling_period = timedelta(
             seconds=samples_time_delta.total_seconds() / props.received_samples
         )
+        # To see which samples are relevant we need to consider if we are down
+        # or upsampling.
+        self._max_relevant_age = (
+            max(config.resampling_period, props.sampling_period)
+            * config.max_data_age_in_periods
+        )
 
         _logger.debug(
             "New input sampling period calculated for %r: %ss",
@@ -672,6 +697,7 @@ class _ResamplingHelper:
         )
 
         self._buffer = deque(self._buffer, maxlen=new_buffer_len)
+        self._timestamps = deque(self._timestamps, maxlen=new_buffer_len)
 
         return True
 
@@ -687,29 +713,24 @@ class _ResamplingHelper:
                 If there are no *relevant* samples, then the new sample will
                 have `None` as `value`.
         """
-        if self._update_source_sample_period(timestamp):
-            self._update_buffer_len()
-
         conf = self._config
         props = self._source_properties
 
-        # To see which samples are relevant we need to consider if we are down
-        # or upsampling.
-        period = (
-            max(
-                conf.resampling_period,
-                props.sampling_period,
-            )
-            if props.sampling_period is not None
-            else conf.resampling_period
-        )
-        minimum_relevant_timestamp = timestamp - period * conf.max_data_age_in_periods
+        # The sampling period is only calculated once, so once we know it there
+        # is nothing left to update.
+        if props.sampling_period is None and self._update_source_sample_period(
+            timestamp
+        ):
+            self._update_buffer_len()
+
+        minimum_relevant_timestamp = timestamp - self._max_relevant_age
+        # If there is no data or all of it is too old (for example, because the
+        # source stopped sending samples), there is nothing to look for.
+        if not self._timestamps or self._timestamps[-1] <= minimum_relevant_timestamp:
+            return Sample(timestamp, None)
 
-        # We need to pass a dummy Sample to bisect because it only support
-        # specifying a key extraction function in Python 3.10, so we need to
-        # compare samples at the moment.
-        min_index = bisect(self._buffer, Sample(minimum_relevant_timestamp, None))
-        max_index = bisect(self._buffer, Sample(timestamp, None))
+        min_index = bisect(self._timestamps, minimum_relevant_timestamp)
+        max_index = bisect(self._timestamps, timestamp)
         # Using itertools for slicing doesn't look very efficient, but
         # experiments with a custom (ring) buffer that can slice showed that
         # it is not that bad. See:
@@ -768,7 +789,8 @@ class _StreamingHelper:
         error).
         """
         async for sample in self._source:
-            if sample.value is not None and not math.isnan(sample.value):
+            value = sample.value
+            if value is not None and not math.isnan(value):
                 self._helper.add_sample(sample)
 
     async def resample(self, timestamp: datetime) -> None:
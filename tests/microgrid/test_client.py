@@ -12,6 +12,7 @@ import pytest
 from frequenz.api.microgrid import common_pb2 as common_pb
 from frequenz.api.microgrid import microgrid_pb2 as microgrid_pb
 from google.protobuf.empty_pb2 import Empty  # pylint: disable=no-name-in-module
+from pytest_mock import MockerFixture
 
 from frequenz.sdk.microgrid import client
 from frequenz.sdk.microgrid.client import Connection, LinearBackoff
@@ -485,6 +486,46 @@ class TestMicrogridGrpcClient:
         assert isinstance(latest, EVChargerData)
         assert latest.component_id == 83
 
+    async def test_expect_category_cache(self, mocker: MockerFixture) -> None:
+        """Check that component categories are fetched only when needed."""
+        servicer = mock_api.MockMicrogridServicer()
+        list_components = mocker.spy(servicer, "ListComponents")
+        server = mock_api.MockGrpcServer(servicer, port=57899)
+        await server.start()
+
+        try:
+            microgrid = self.create_client(57899)
+
+            servicer.add_component(
+                83, microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_METER
+            )
+            servicer.add_component(
+                38, microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_BATTERY
+            )
+
+            await microgrid.meter_data(83)
+            await microgrid.battery_data(38)
+            with pytest.raises(ValueError):
+                await microgrid.meter_data(38)
+            assert list_components.call_count == 1
+
+            # unknown component ids trigger a refresh
+            servicer.add_component(
+                55, microgrid_pb.ComponentCategory.COMPONENT_CATEGORY_INVERTER
+            )
+            await microgrid.inverter_data(55)
+            assert list_components.call_count == 2
+
+            # and so does an expired cache
+            mocker.patch(
+                "frequenz.sdk.microgrid.client._client.COMPONENTS_CACHE_TTL", 0.0
+            )
+            await microgrid.meter_data(83)
+            assert list_components.call_count == 3
+
+        finally:
+            assert await server.graceful_shutdown()
+
     async def test_charge(self) -> None:
         """Check if charge is able to charge component."""
         servicer = mock_api.MockMicrogridServicer()
@@ -567,3 +608,26 @@ class TestMicrogridGrpcClient:
         assert sorted(servicer.get_bounds(), key=sort_key) == sorted(
             expected_bounds, key=sort_key
         )
+
+    async def test_set_bounds_completes(self) -> None:
+        """Check that `set_bounds` returns only once the server got the bounds."""
+        servicer = mock_api.MockMicrogridServicer()
+        server = mock_api.MockGrpcServer(servicer, port=57899)
+        await server.start()
+
+        try:
+            microgrid = self.create_client(57899)
+
+            await microgrid.set_bounds(38, -10.0, 2.0)
+
+            assert servicer.get_bounds() == [
+                microgrid_pb.SetBoundsParam(
+                    component_id=38,
+                    target_metric=(
+                        microgrid_pb.SetBoundsParam.TargetMetric.TARGET_METRIC_POWER_ACTIVE
+                    ),
+                    bounds=common_pb.Bounds(lower=-10, upper=2),
+                )
+            ]
+        finally:
+            assert await server.graceful_shutdown()
@@ -9,7 +9,10 @@ from typing import Callable, Dict, List, Optional, Tuple, Union
 
 from frequenz.channels import Broadcast, Receiver
 
+from frequenz.sdk.actor import ChannelRegistry, ComponentMetricRequest
+from frequenz.sdk.microgrid.component import ComponentMetricId
 from frequenz.sdk.timeseries import Sample
+from frequenz.sdk.timeseries._formula_engine import ResampledFormulaBuilder
 from frequenz.sdk.timeseries._formula_engine._formula_engine import (
     FormulaBuilder,
     FormulaEngine,
@@ -603,3 +606,43 @@ class TestFormulaAverager:
                 ([None, None, None], 0.0),
             ],
         )
+
+
+class TestResampledFormulaBuilder:
+    """Tests for the ResampledFormulaBuilder."""
+
+    def create_builder(self) -> ResampledFormulaBuilder:
+        """Create a builder that is not connected to a resampling actor."""
+        return ResampledFormulaBuilder(
+            "test",
+            "test_formula",
+            ChannelRegistry(name="test-registry"),
+            Broadcast[ComponentMetricRequest]("resampler-requests").new_sender(),
+            ComponentMetricId.ACTIVE_POWER,
+        )
+
+    def test_push_component_metrics_sum(self) -> None:
+        """Test that a sum of metrics is pushed like individual metrics."""
+        builder = self.create_builder()
+        builder.push_component_metrics_sum([4, 2, 7], nones_are_zeros=True)
+        steps, fetchers = builder.finalize()
+
+        assert repr(steps) == "[#4, #2, +, #7, +]"
+        assert list(fetchers) == ["#4", "#2", "#7"]
+
+    def test_push_component_metrics_sum_single(self) -> None:
+        """Test that a sum of a single metric needs no operators."""
+        builder = self.create_builder()
+        builder.push_component_metrics_sum(iter([5]), nones_are_zeros=True)
+        steps, _ = builder.finalize()
+
+        assert repr(steps) == "[#5]"
+
+    def test_push_component_metrics_sum_empty(self) -> None:
+        """Test that a sum of no metrics pushes nothing."""
+        builder = self.create_builder()
+        builder.push_component_metrics_sum([], nones_are_zeros=True)
+        steps, fetchers = builder.finalize()
+
+        assert not steps
+        assert not fetchers
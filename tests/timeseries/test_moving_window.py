@@ -44,9 +44,12 @@ async def push_lm_data(sender: Sender[Sample], test_seq: Sequence[float]) -> Non
         test_seq: The Sequence that is pushed into the `MovingWindow`.
     """
     start_ts: datetime = datetime(2023, 1, 1, tzinfo=timezone.utc)
-    for i, j in zip(test_seq, range(0, len(test_seq))):
-        timestamp = start_ts + timedelta(seconds=j)
-        await sender.send(Sample(timestamp, float(i)))
+    samples = [
+        Sample(start_ts + timedelta(seconds=i), float(value))
+        for i, value in enumerate(test_seq)
+    ]
+    for sample in samples:
+        await sender.send(sample)
 
     await asyncio.sleep(0.0)
 
@@ -167,6 +167,8 @@ async def test_helper_buffer_too_big(
     )
     # pylint: disable=protected-access
     assert helper._buffer.maxlen == DEFAULT_BUFFER_LEN_MAX
+    assert helper._timestamps.maxlen == DEFAULT_BUFFER_LEN_MAX
+    assert list(helper._timestamps) == [s.timestamp for s in helper._buffer]
 
 
 @pytest.mark.parametrize(
@@ -1042,6 +1044,39 @@ async def test_receiving_resampling_error(fake_time: time_machine.Coordinates) -
     assert isinstance(timeseries_error, TestException)
 
 
+async def test_resampling_error_with_removed_timeseries(
+    fake_time: time_machine.Coordinates, source_chan: Broadcast[Sample]
+) -> None:
+    """Test errors are matched to their sources if a timeseries is removed."""
+    resampling_period_s = 2
+    resampler = Resampler(
+        ResamplerConfig(resampling_period=timedelta(seconds=resampling_period_s))
+    )
+
+    class TestException(Exception):
+        """Test exception."""
+
+    removed_recvr = source_chan.new_receiver()
+    failing_recvr = source_chan.new_receiver()
+
+    async def removing_sink(_: Sample) -> None:
+        resampler.remove_timeseries(removed_recvr)
+
+    failing_sink = AsyncMock(spec=Sink, side_effect=TestException("Test error"))
+
+    resampler.add_timeseries("removed", removed_recvr, removing_sink)
+    resampler.add_timeseries("failing", failing_recvr, failing_sink)
+
+    fake_time.shift(resampling_period_s)
+    with pytest.raises(ResamplingError) as excinfo:
+        await resampler.resample(one_shot=True)
+
+    exceptions = excinfo.value.exceptions
+    assert len(exceptions) == 1
+    assert failing_recvr in exceptions
+    assert isinstance(exceptions[failing_recvr], TestException)
+
+
 def _get_buffer_len(resampler: Resampler, source_recvr: Source) -> int:
     # pylint: disable=protected-access
     blen = resampler._resamplers[source_recvr]._helper._buffer.maxlen